@@ -11,16 +11,6 @@ copyright = '2023, Mal Minhas'
 author = 'Mal Minhas'
 release = '0.2'
 
-# -- Path setup --------------------------------------------------------------
-# If extensions (or modules to document with autodoc) are in another directory,
-# add these directories to sys.path here. If the directory is relative to the
-# documentation root, use os.path.abspath to make it absolute, like shown here.
-#
-import os
-import sys
-sys.path.insert(0, os.path.abspath('../..'))
-sys.setrecursionlimit(1500)
-
 # -- General configuration ---------------------------------------------------
 # https://www.sphinx-doc.org/en/master/usage/configuration.html#general-configuration
 
@@ -28,9 +18,16 @@ sys.setrecursionlimit(1500)
 # extensions coming with Sphinx (named 'sphinx.ext.*') or your custom
 # ones.
 extensions = [
-    'sphinx.ext.autodoc'
+    'autoapi.extension'
 ]
 
+# sphinx-autoapi parses the source statically rather than importing it like
+# sphinx.ext.autodoc, so building the docs doesn't need matplotlib, networkx etc.
+# See: https://sphinx-autoapi.readthedocs.io/
+autoapi_type = 'python'
+autoapi_dirs = ['../..']
+autoapi_ignore = ['*/docs/*', '*.ipynb_checkpoints*', '*/venv/*', '*/.venv/*', '*/build/*']
+
 templates_path = ['_templates']
 # List of patterns, relative to source directory, that match files and
 # directories to ignore when looking for source files.
@@ -14,12 +14,14 @@
 # -------------
 # pip install -r requirements.txt
 # You will also need to install graphviz.  You can do this via Homebrew on your Mac
+# For fast YAML parsing install libyaml before PyYAML so it is built with its C bindings
 #
 # Implementation:
 # --------------
 # There is one class in this module:
 # OrganisationDiagrammer - ingests a YAML organisation file and converts it to:
 # a) dot representation, b) graphviz visualisation
+# matplotlib and PIL are imported lazily so loading YAML and writing dot files doesn't pay for them
 #
 # Documentation:
 # -------------
@@ -30,8 +32,8 @@
 # $ sphinx-quickstart             => creates a Makefile, a make.bat file, as well as build and source directories.
 # $ cd source                     => edit the conf.py file
 # $ pip install sphinx-rtd-theme  => if this theme has been chosen
+# $ pip install sphinx-autoapi    => API pages are generated from source by autoapi.extension in conf.py
 # $ cd ..                         => back to docs directory
-# $ sphinx-apidoc -o source ..    => generates index.rst and cat-review.rst files into source directory
 # $ make html
 # $ open html/index.html
 #
@@ -51,33 +53,82 @@ This module has one main class:
 * `OrganisationDiagrammer`
 """
 
+import io
 import os
 import sys
+import pickle
+import hashlib
+import statistics
 import time
 import yaml
 import logging
 import docopt
+import collections
+import itertools
+import numpy as np  # type: ignore
+from functools import lru_cache
 from logging import Logger
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Callable, Optional
 import networkx as nx  # type: ignore
-from PIL import Image
-import matplotlib.pyplot as plt  # type: ignore
+
+# Prefer the libyaml backed loader which is much faster than the pure Python one
+try:
+    from yaml import CSafeLoader as YamlLoader
+except ImportError:
+    from yaml import SafeLoader as YamlLoader  # type: ignore
 
 PROGRAM = __file__.split("/")[-1]
 VERSION = "0.3"
 DATE = "09.04.23"
 AUTHOR = "<mal.minhas@checkatrade.com>"
 
-VALID_STATUS = ["perm", "contractor", "starting", "leaving", "moving", "new"]
-VALID_TEAM = ["A", "B", "C", "D", "E", "F"]
-VALID_RELATION = [1, 2, 3, 4]
+_STATUS_ORDER = ("perm", "contractor", "starting", "leaving", "moving", "new")
+_TEAM_ORDER = ("A", "B", "C", "D", "E", "F")
+_RELATION_ORDER = (1, 2, 3, 4)
+VALID_STATUS = frozenset(_STATUS_ORDER)
+VALID_TEAM = frozenset(_TEAM_ORDER)
+VALID_RELATION = frozenset(_RELATION_ORDER)
 
 DEFAULT_NODE_SIZE = 7500
 DEFAULT_MARGIN = 0.1
 DEFAULT_CSTYLE = "arc3"
+# Edge styles which draw a straight line between nodes
+STRAIGHT_CSTYLES = ("arc", "arc3")
 DEFAULT_OFFSET = 7
 DEFAULT_EDGE_LABEL_HEIGHT = 0.3
+# Node fill colour by status, anything else (eg. perm) gets DEFAULT_STATUS_COLOR
+# status can be: perm|contractor|new|hiring|starting|leaving|moving
+# colors - see: https://matplotlib.org/stable/gallery/color/named_colors.html
+STATUS_COLORS = {
+    "hiring": "red",
+    "leaving": "orange",
+    "starting": "teal",
+    "new": "lightgreen",
+    "moving": "yellowgreen",
+    "contractor": "grey",
+}
+DEFAULT_STATUS_COLOR = "green"
 DEFAULT_FONT_SIZE = 16
+DEFAULT_LAYOUT_ARGS = "-Gnodesep=3 -Granksep=0 -Gpad=0.1 -Grankdir=TB"
+DEFAULT_LAYOUT_CHUNK_SIZE = 200
+DEFAULT_RANK_STEP = 100.0
+
+# Parsed YAML and built graphs are cached here keyed by a digest of the YAML content
+CACHE_DIR = os.path.join(
+    os.environ.get("XDG_CACHE_HOME", os.path.join(os.path.expanduser("~"), ".cache")),
+    "organogram",
+)
+# matplotlib settings applied while rendering: simplify paths and have Agg draw
+# long paths in big chunks.  Scoped to the render rather than set globally.
+RENDER_RC_PARAMS = {
+    "path.simplify": True,
+    "path.simplify_threshold": 1.0,
+    "agg.path.chunksize": 10000,
+}
+# Parsed YAML kept in-process, keyed by path and file stat, so repeated loads of an
+# unchanged file skip even the digest and on-disk cache.  Oldest entries go first.
+YAML_CACHE_SIZE = 32
+_YAML_CACHE: "collections.OrderedDict[tuple, bytes]" = collections.OrderedDict()
 
 
 def initLogger(verbose: bool) -> Logger:
@@ -102,9 +153,13 @@ def initLogger(verbose: bool) -> Logger:
         logger = logging.getLogger(__name__)
         logger.setLevel(logging.INFO)
     else:
-        # this will silence all logging including from modules
+        # this will silence all logging including from modules.  Keeping the level
+        # at WARNING means logger.isEnabledFor(logging.INFO) short-circuits so hot
+        # paths can skip building log messages altogether.
         logger = logging.getLogger(__name__)
-        logger.addHandler(logging.FileHandler(os.devnull))
+        logger.setLevel(logging.WARNING)
+        if not any(isinstance(h, logging.NullHandler) for h in logger.handlers):
+            logger.addHandler(logging.NullHandler())
     return logger
 
 
@@ -163,10 +218,286 @@ def proc_field(val: str, newline: bool = False, upper: bool = False) -> str:
             val = val.upper()
     else:
         val = ""
-    logger.info(f"::proc_field() - converting {repr(inputval)} to {repr(val)}")
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("::proc_field() - converting %r to %r", inputval, val)
     return val
 
 
+# Specialised versions of proc_field for the graph build hot loop.  Each caller
+# picks the transform it needs once so there is no per-field branching or logging.
+# Names and teams recur across nodes and edges, so the string-building variants are
+# memoised; the cache is bounded to keep long-running processes from growing.
+PROC_FIELD_CACHE_SIZE = 4096
+
+
+def _plain(val: Any) -> Any:
+    return val or ""
+
+
+@lru_cache(maxsize=PROC_FIELD_CACHE_SIZE)
+def _newline(val: str) -> str:
+    return "\n".join(val.split(" ", 1)) if val else ""
+
+
+@lru_cache(maxsize=PROC_FIELD_CACHE_SIZE)
+def _upper(val: str) -> str:
+    return val.upper() if val else ""
+
+
+@lru_cache(maxsize=PROC_FIELD_CACHE_SIZE)
+def _newline_upper(val: str) -> str:
+    return "\n".join(val.upper().split(" ", 1)) if val else ""
+
+
+def _make_proc(newline: bool, upper: bool) -> Callable[[Any], Any]:
+    """
+    Pick the specialised equivalent of `proc_field` for fixed flags, so code calling
+    it in a loop does not re-test them on every field.
+
+    **Parameters**
+
+    newline : `bool`
+        replace the first space with a newline or not
+    upper : `bool`
+        convert to upper case or not
+
+    **Returns**
+
+    proc : `Callable`
+        function of one value returning the processed field.
+
+    """
+    if newline:
+        return _newline_upper if upper else _newline
+    return _upper if upper else _plain
+
+
+def node_soa(g: nx.DiGraph) -> Dict[str, List]:
+    """
+    Materialise the node attributes of a graph as parallel lists (Structure-of-Arrays)
+    so drawing code can scan them without re-walking the NetworkX node views.
+
+    **Parameters**
+
+    g : `nx.DiGraph`
+        NetworkX graph of organisation built from yaml_data
+
+    **Returns**
+
+    soa : `Dict`
+        dictionary of equal length lists keyed by `name`, `status`, `manager`,
+        `team`, `note` and `jobtitle`, indexed identically.
+
+    """
+    # The node count is known up front so every column is allocated at its final
+    # size and filled by index rather than grown by append
+    count = g.number_of_nodes()
+    names = [None] * count
+    status = [None] * count
+    manager = [None] * count
+    team = [None] * count
+    note = [None] * count
+    jobtitle = [None] * count
+    for i, (u, d) in enumerate(g.nodes(data=True)):
+        names[i] = u
+        status[i] = d.get("status")
+        manager[i] = d.get("manager")
+        team[i] = d.get("team")
+        note[i] = d.get("note")
+        jobtitle[i] = d.get("jobtitle")
+    return {
+        "name": names,
+        "status": status,
+        "manager": manager,
+        "team": team,
+        "note": note,
+        "jobtitle": jobtitle,
+    }
+
+
+# Plain YAML scalars are resolved and constructed just as the safe loader would,
+# so streamed values have the same types (eg. int relationships) as loaded ones
+_yaml_resolver = yaml.resolver.Resolver()
+_yaml_constructor = yaml.constructor.SafeConstructor()
+
+
+def _yaml_scalar(event: yaml.ScalarEvent) -> Any:
+    tag = event.tag
+    if tag is None or tag == "!":
+        tag = _yaml_resolver.resolve(yaml.ScalarNode, event.value, event.implicit)
+    construct = _yaml_constructor.yaml_constructors.get(tag)
+    if construct is None:
+        return event.value
+    node = yaml.ScalarNode(tag, event.value, style=event.style)
+    return construct(_yaml_constructor, node)
+
+
+def get_file_digest(file_path: str) -> str:
+    """
+    Get a digest of the file contents.  Used as a cache key in preference to mtime
+    which git resets on every checkout.
+
+    **Parameters**
+
+    file_path : `str`
+        filename
+
+    **Returns**
+
+    digest : `str`
+        hex BLAKE2 digest of the file contents.
+
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(65536), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def peek_yaml_header(file_path: str, max_lines: int = 64) -> Dict:
+    """
+    Parse just the first lines of a YAML organisation file.  Any list cut short by
+    the line limit loses its last item as it may be incomplete.  If the truncated
+    text is not valid YAML nothing is returned rather than parsing the whole file.
+
+    **Parameters**
+
+    file_path : `str`
+        name of YAML file
+    max_lines : `int`
+        maximum number of lines to read.  64 by default.
+
+    **Returns**
+
+    data : `Dict`
+        dictionary of the `nodes` and `edges` found in the header.
+
+    """
+    with open(file_path, "rb") as f:
+        lines = list(itertools.islice(f, max_lines))
+        truncated = bool(f.readline())
+    try:
+        data = yaml.load(b"".join(lines), Loader=YamlLoader)
+    except yaml.YAMLError:
+        return {}
+    if not isinstance(data, dict):
+        return {}
+    if truncated:
+        data = {k: v[:-1] if isinstance(v, list) else v for k, v in data.items()}
+    return data
+
+
+def _cache_path(key: str, ext: str) -> str:
+    return os.path.join(CACHE_DIR, key + ext)
+
+
+def _save_cache(path: str, obj: Any, dump: Callable, mode: str):
+    # Best effort: write to a temporary file and rename so a reader never sees a
+    # partial entry, and never fail the caller if the cache can't be written
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(tmp, mode) as f:
+            dump(obj, f)
+        os.replace(tmp, path)
+    except (OSError, TypeError, ValueError, pickle.PicklingError) as e:
+        logger.info(f'::_save_cache() - not caching "{path}": {e}')
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+# Artist helpers shared by the draw_networkx_* methods, bound once at module load
+_dnn = nx.draw_networkx_nodes
+_dne = nx.draw_networkx_edges
+
+
+def _draw_nodes(
+    g: nx.DiGraph,
+    pos: Dict,
+    nlist: List,
+    color: Any,
+    node_size: int,
+    margin: float,
+    lwidth: Any = None,
+    ecolors: Any = None,
+    ax: Any = None,
+):
+    # nodes - see: https://matplotlib.org/stable/api/markers_api.html#module-matplotlib.markers
+    # The node squares are rasterized so vector outputs (svg, pdf) embed one bitmap
+    # rather than a path per node
+    collection = _dnn(
+        g,
+        pos,
+        node_shape="s",
+        margins=margin,
+        nodelist=nlist,
+        node_color=color,
+        linewidths=lwidth,
+        edgecolors=ecolors,
+        node_size=node_size,
+        ax=ax,
+    )
+    collection.set_rasterized(True)
+
+
+def _draw_edges(
+    g: nx.DiGraph,
+    pos: Dict,
+    elist: List,
+    cstyle: str,
+    w: float,
+    a: float,
+    color: Any,
+    style: Any,
+    ax: Any = None,
+):
+    # styles - see: https://matplotlib.org/stable/api/_as_gen/matplotlib.patches.Patch.html#matplotlib.patches.Patch.set_linestyle
+    if cstyle in STRAIGHT_CSTYLES:
+        # Straight edges go into a single LineCollection rather than one
+        # FancyArrowPatch per edge.  Arrow heads are lost but sit under the node
+        # squares anyway as edges are not shrunk to the node size.  The patches
+        # drew round capped dashes so the collection does too, otherwise dotted
+        # edges shrink from dashes to small square dots.
+        collection = _dne(
+            g,
+            pos,
+            arrows=False,
+            edgelist=elist,
+            width=w,
+            alpha=a,
+            edge_color=color,
+            style=style,
+            ax=ax,
+        )
+        if elist:  # nothing is drawn and no collection returned for no edges
+            collection.set_capstyle("round")
+    else:
+        _dne(
+            g,
+            pos,
+            connectionstyle=cstyle,
+            edgelist=elist,
+            width=w,
+            alpha=a,
+            edge_color=color,
+            style=style,
+            ax=ax,
+        )
+
+
+def _dot_id(val: Any) -> str:
+    return '"' + str(val).replace('"', '\\"') + '"'
+
+
+def _dot_attrs(d: Dict) -> str:
+    # Unset attributes are left out just as graphviz omits empty ones
+    attrs = ", ".join(
+        f"{k}={_dot_id(v)}" for k, v in sorted(d.items()) if v is not None and v != ""
+    )
+    return f"\t[{attrs}]" if attrs else ""
+
+
 class OrganisationDiagrammer(object):
     def __init__(
         self,
@@ -180,15 +511,22 @@ class OrganisationDiagrammer(object):
         Constructor method. Creates a :py:class: `OrganisationDiagrammer` instance
         """
         logger.info(f"OrganisationDiagrammer::__init__() - constructor")
-        self._graph = None
+        self._layout_cache: Dict[str, Dict] = {}
+        self._fig = None
+        self._ax = None
+        self._fig_size = None
         self._node_size = node_size
         self._margin = margin
         self._cstyle = cstyle
         self._font_size = font_size
         self._offset = offset
-        self._validTeams = VALID_TEAM
-        self._validStatus = VALID_STATUS
-        self._validRelations = VALID_RELATION
+        self._validTeams = list(_TEAM_ORDER)
+        self._validStatus = list(_STATUS_ORDER)
+        self._validRelations = list(_RELATION_ORDER)
+        # frozenset copies of the above for O(1) membership tests when validating
+        self._validTeamSet = VALID_TEAM
+        self._validStatusSet = VALID_STATUS
+        self._validRelationSet = VALID_RELATION
 
     @property
     def valid_teams(self) -> List:
@@ -222,6 +560,7 @@ class OrganisationDiagrammer(object):
             f'OrganisationDiagrammer::set_valid_teams() - setting valid teams to "{teams}"'
         )
         self._validTeams = teams
+        self._validTeamSet = frozenset(teams)
 
     @property
     def valid_status(self) -> List:
@@ -255,6 +594,7 @@ class OrganisationDiagrammer(object):
             f'OrganisationDiagrammer::set_valid_status() - setting valid status to "{status}"'
         )
         self._validStatus = status
+        self._validStatusSet = frozenset(status)
 
     @property
     def valid_relations(self) -> List:
@@ -288,8 +628,11 @@ class OrganisationDiagrammer(object):
             f'OrganisationDiagrammer::set_valid_relations() - setting valid relations to "{relations}"'
         )
         self._validRelations = relations
+        self._validRelationSet = frozenset(relations)
 
-    def load_yaml_file(self, file_path: str) -> Dict[Optional[Any], Optional[Any]]:
+    def load_yaml_file(
+        self, file_path: str, validate: bool = False
+    ) -> Dict[Optional[Any], Optional[Any]]:
         """
         Load YAML organisation configuration file and convert to Dict
 
@@ -297,6 +640,10 @@ class OrganisationDiagrammer(object):
 
         file_path : `str`
             name of YAML file
+        validate : `bool`
+            check the entries at the head of the file before parsing all of it, so
+            an invalid file is rejected quickly.  The full check is still made by
+            `create_graph_from_yaml(data, validate=True)`.
 
         **Returns**
 
@@ -307,8 +654,50 @@ class OrganisationDiagrammer(object):
         logger.info(
             f'OrganisationDiagrammer::load_yaml_file() - loading YAML from "{file_path}"'
         )
-        with open(file_path, "r") as file:
-            data = yaml.safe_load(file)
+        stat = os.stat(file_path)
+        key = (os.path.abspath(file_path), stat.st_mtime_ns, stat.st_size)
+        # Entries are kept pickled so every load gets its own copy that the caller
+        # is free to modify without affecting later loads
+        blob = _YAML_CACHE.get(key)
+        if blob is not None:
+            logger.info(
+                f'OrganisationDiagrammer::load_yaml_file() - using in-memory copy of "{file_path}"'
+            )
+            return pickle.loads(blob)
+        data = self._load_yaml_file(file_path, validate)
+        _YAML_CACHE[key] = pickle.dumps(data, pickle.HIGHEST_PROTOCOL)
+        if len(_YAML_CACHE) > YAML_CACHE_SIZE:
+            _YAML_CACHE.popitem(last=False)
+        return data
+
+    def _load_yaml_file(
+        self, file_path: str, validate: bool
+    ) -> Dict[Optional[Any], Optional[Any]]:
+        # Unpickling is far quicker than parsing YAML so keep a pickled copy in the
+        # cache keyed by the YAML content, which survives git checkouts unlike mtime.
+        # Unlike JSON, pickle round trips every type the YAML loader can produce.
+        cache = _cache_path(get_file_digest(file_path), ".yaml.pickle")
+        try:
+            with open(cache, "rb") as file:
+                data = pickle.load(file)
+            logger.info(
+                f'OrganisationDiagrammer::load_yaml_file() - using cached "{cache}"'
+            )
+            return data
+        except (OSError, EOFError, pickle.UnpicklingError):
+            pass
+        if validate:
+            # Reject an invalid file on its first few entries before parsing it all
+            head = peek_yaml_header(file_path)
+            for node in head.get("nodes") or []:
+                self._yaml_node(node, _plain, _upper, validate)
+            for edge in head.get("edges") or []:
+                self._yaml_edge(edge, _plain, validate)
+        # Hand libyaml the binary file so it streams and decodes it in C rather than
+        # us reading and decoding the whole document into a Python string first
+        with open(file_path, "rb") as file:
+            data = yaml.load(file, Loader=YamlLoader)
+        _save_cache(cache, data, pickle.dump, "wb")
         return data
 
     def create_graph_from_yaml(
@@ -337,43 +726,178 @@ class OrganisationDiagrammer(object):
             f"OrganisationDiagrammer::create_graph_from_yaml() - newline={newline},  validate={validate}"
         )
         g = nx.DiGraph()
-        for node in yaml_data["nodes"]:
-            name = proc_field(node.get("id"), newline)
-            note = proc_field(node.get("note"))
-            team = proc_field(node.get("team"))
-            job = proc_field(node.get("label"), newline)
-            rank = proc_field(node.get("rank"))
-            manager = proc_field(node.get("manager"))
-            if team:
-                if validate:
-                    assert team in self._validTeams
-                team = proc_field(team, newline, upper=True)
-            status = node.get("status")
-            if validate and status:
-                assert status in self._validStatus
-            if name:
-                g.add_node(
-                    name,
-                    rank=rank,
-                    jobtitle=job,
-                    status=status,
-                    manager=manager,
-                    note=note,
-                    team=team,
-                )
-        for edge in yaml_data["edges"]:
-            source = proc_field(edge.get("source"), newline)
-            target = proc_field(edge.get("target"), newline)
-            label = proc_field(edge.get("label"))
-            relation = proc_field(edge.get("relationship"))
-            if validate:
-                assert relation in self._validRelations
-            if source:
-                g.add_edge(source, target, label=label, relationship=relation)
+        name_field = _make_proc(newline, False)
+        team_field = _make_proc(newline, True)
+        yaml_node = self._yaml_node
+        yaml_edge = self._yaml_edge
+        # Convert everything first then hand NetworkX whole batches, which is far
+        # cheaper than growing the graph one add_node/add_edge call at a time
+        nodes = [yaml_node(n, name_field, team_field, validate) for n in yaml_data["nodes"]]
+        edges = [yaml_edge(e, name_field, validate) for e in yaml_data["edges"]]
+        g.add_nodes_from(n for n in nodes if n is not None)
+        g.add_edges_from(e for e in edges if e is not None)
+        return self._built_graph(g)
+
+    def build_graph_from_yaml_file(
+        self, file_path: str, newline: bool = True, validate: bool = False
+    ) -> nx.DiGraph:
+        """
+        Stream a YAML organisation configuration file straight into a NetworkX graph.
+        Equivalent to `create_graph_from_yaml(load_yaml_file(file_path))` but walks the
+        YAML parser events and adds each node and edge as soon as its mapping ends, so
+        the whole document is never held in memory as a `Dict`.  Anchors and aliases
+        are not supported.
+
+        **Parameters**
+
+        file_path : `str`
+            name of YAML file
+        newline : `bool`
+            newline or not
+        validate : `bool`
+            validate teams, statuses, relations or not.
+
+        **Returns**
+
+        g : `nx.DiGraph`
+            NetworkX graph of organisation built from the YAML file
+
+        """
+        logger.info(
+            f'OrganisationDiagrammer::build_graph_from_yaml_file() - streaming YAML from "{file_path}", newline={newline}, validate={validate}'
+        )
+        # Unpickling a built graph is quicker than parsing and building it again
+        key = repr((VERSION, get_file_digest(file_path), newline, validate))
+        if validate:
+            valid = (self._validTeamSet, self._validStatusSet, self._validRelationSet)
+            key += repr([sorted(map(repr, v)) for v in valid])
+        digest = hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
+        cache = _cache_path(digest, ".pickle")
+        try:
+            with open(cache, "rb") as file:
+                g = pickle.load(file)
+            logger.info(
+                f'OrganisationDiagrammer::build_graph_from_yaml_file() - using cached "{cache}"'
+            )
+            return self._built_graph(g)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            pass
+        g = nx.DiGraph()
+        name_field = _make_proc(newline, False)
+        team_field = _make_proc(newline, True)
+        depth = 0  # collection nesting depth, 1 is the top level mapping
+        top_key = None  # pending top level key awaiting its value
+        section = None  # "nodes" or "edges" while inside that top level sequence
+        item = None  # node or edge mapping currently being read
+        key = None  # pending key within item awaiting its value
+        yaml_node = self._yaml_node
+        yaml_edge = self._yaml_edge
+        with open(file_path, "rb") as file:
+            for event in yaml.parse(file, Loader=YamlLoader):
+                if isinstance(event, (yaml.MappingStartEvent, yaml.SequenceStartEvent)):
+                    depth += 1
+                    if depth == 2:
+                        section = top_key if top_key in ("nodes", "edges") else None
+                        top_key = None
+                    elif depth == 3 and section:
+                        if isinstance(event, yaml.MappingStartEvent):
+                            item = {}
+                            key = None
+                elif isinstance(event, (yaml.MappingEndEvent, yaml.SequenceEndEvent)):
+                    if depth == 2:
+                        section = None
+                    elif depth == 3 and item is not None:
+                        # each entry goes into the graph as soon as its mapping
+                        # ends so only one is ever held outside the graph
+                        if section == "nodes":
+                            entry = yaml_node(item, name_field, team_field, validate)
+                            if entry is not None:
+                                g.add_node(entry[0], **entry[1])
+                        else:
+                            entry = yaml_edge(item, name_field, validate)
+                            if entry is not None:
+                                g.add_edge(entry[0], entry[1], **entry[2])
+                        item = None
+                    elif depth == 4 and item is not None:
+                        # nested collections within a node or edge are ignored
+                        key = None
+                    depth -= 1
+                elif isinstance(event, yaml.ScalarEvent):
+                    if depth == 1:
+                        top_key = _yaml_scalar(event) if top_key is None else None
+                    elif depth == 3 and item is not None:
+                        if key is None:
+                            key = _yaml_scalar(event)
+                        else:
+                            item[key] = _yaml_scalar(event)
+                            key = None
+                elif isinstance(event, yaml.AliasEvent):
+                    raise ValueError(
+                        f'YAML aliases are not supported when streaming "{file_path}"'
+                    )
+        _save_cache(cache, g, pickle.dump, "wb")
+        return self._built_graph(g)
+
+    def _yaml_node(
+        self, node: Dict, name_field: Callable, team_field: Callable, validate: bool
+    ) -> Optional[tuple]:
+        name = name_field(node.get("id"))
+        note = _plain(node.get("note"))
+        team = _plain(node.get("team"))
+        job = name_field(node.get("label"))
+        rank = _plain(node.get("rank"))
+        manager = _plain(node.get("manager"))
+        if team:
+            if validate and team not in self._validTeamSet:
+                raise ValueError(f'Invalid team "{team}" for node "{name}"')
+            team = team_field(team)
+        status = node.get("status")
+        if validate and status and status not in self._validStatusSet:
+            raise ValueError(f'Invalid status "{status}" for node "{name}"')
+        if not name:
+            return None
+        return (
+            name,
+            {
+                "rank": rank,
+                "jobtitle": job,
+                "status": status,
+                "manager": manager,
+                "note": note,
+                "team": team,
+            },
+        )
+
+    def _yaml_edge(
+        self, edge: Dict, name_field: Callable, validate: bool
+    ) -> Optional[tuple]:
+        source = name_field(edge.get("source"))
+        target = name_field(edge.get("target"))
+        label = _plain(edge.get("label"))
+        relation = _plain(edge.get("relationship"))
+        if validate and relation not in self._validRelationSet:
+            raise ValueError(
+                f'Invalid relationship "{relation}" for edge "{source}" -> "{target}"'
+            )
+        if not source:
+            return None
+        return (source, target, {"label": label, "relationship": relation})
+
+    def _built_graph(self, g: nx.DiGraph) -> nx.DiGraph:
+        logger.info(
+            f"OrganisationDiagrammer::_built_graph() - built graph with {g.number_of_nodes()} nodes and {g.number_of_edges()} edges"
+        )
         return g
 
     def draw_networkx_nodes(
-        self, g: nx.DiGraph, pos: Dict, margin: float, node_size: int, font_size: int
+        self,
+        g: nx.DiGraph,
+        pos: Dict,
+        margin: float,
+        node_size: int,
+        font_size: int,
+        ax: Any = None,
+        soa: Optional[Dict[str, List]] = None,
     ):
         """
         Draw nodes from NetworkX graph and corresponding node labels.
@@ -390,58 +914,55 @@ class OrganisationDiagrammer(object):
             Size of node.  Default is `DEFAULT_NODE_SIZE` (7000)
         font_size : `int`
             Node text font size.
+        ax : `matplotlib.axes.Axes`
+            Axes to draw on.  Default is the current pyplot Axes
+        soa : `Dict`
+            Node attributes from `node_soa`, built from `g` if not given
 
         **Returns**
 
         """
-        logger.info(
-            f"OrganisationDiagrammer::draw_networkx_nodes() - margin={margin}, node_size={node_size}, pos=\n{pos}"
-        )
-        # Pull out the different status cohorts for nodes
-        # status can be: perm|contractor|new|hiring|starter|joining|leaving
-        n_perm = [(u) for (u, d) in g.nodes(data=True) if d.get("status") == "perm"]
-        n_contractor = [
-            (u) for (u, d) in g.nodes(data=True) if d.get("status") == "contractor"
-        ]
-        n_all = [(u) for (u, d) in g.nodes(data=True)]
-        n_starting = [
-            (u) for (u, d) in g.nodes(data=True) if d.get("status") == "starting"
-        ]
-        n_hiring = [
-            (u) for (u, d) in g.nodes(data=True) if d.get("status") == "hiring"
-        ]
-        n_leaving = [
-            (u) for (u, d) in g.nodes(data=True) if d.get("status") == "leaving"
-        ]
-        n_moving = [(u) for (u, d) in g.nodes(data=True) if d.get("status") == "moving"]
-        n_new = [(u) for (u, d) in g.nodes(data=True) if d.get("status") == "new"]
-        n_manager = [(u) for (u, d) in g.nodes(data=True) if d.get("manager") == "yes"]
-
-        # nodes - see: https://matplotlib.org/stable/api/markers_api.html#module-matplotlib.markers
-        # colors - see: https://matplotlib.org/stable/gallery/color/named_colors.html
-        def drawNetworkXNodes(
-            nlist: List, color: str, lwidth: Any = None, ecolors: Any = None
-        ):
-            nx.draw_networkx_nodes(
-                g,
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "OrganisationDiagrammer::draw_networkx_nodes() - margin=%s, node_size=%s, pos=\n%s",
+                margin,
+                node_size,
                 pos,
-                node_shape="s",
-                margins=margin,
-                nodelist=nlist,
-                node_color=color,
-                linewidths=lwidth,
-                edgecolors=ecolors,
-                node_size=node_size,
             )
-
-        drawNetworkXNodes(n_all, "green")
-        drawNetworkXNodes(n_hiring, "red")
-        drawNetworkXNodes(n_leaving, "orange")
-        drawNetworkXNodes(n_starting, "teal")
-        drawNetworkXNodes(n_new, "lightgreen")
-        drawNetworkXNodes(n_moving, "yellowgreen")
-        drawNetworkXNodes(n_contractor, "grey")
-        drawNetworkXNodes(n_manager, "none", 5.0, "black")
+        from matplotlib import rcParams  # type: ignore
+
+        # Work out every node's fill and outline over the SoA status and manager
+        # columns.  Statuses become indices into a palette whose first entry is the
+        # default colour so the fills come from a single fancy indexing lookup.
+        if soa is None:
+            soa = node_soa(g)
+        n_all = soa["name"]
+        palette = np.array([DEFAULT_STATUS_COLOR, *STATUS_COLORS.values()], dtype=object)
+        index = {status: i for i, status in enumerate(STATUS_COLORS, 1)}
+        codes = np.fromiter(
+            (index.get(status, 0) for status in soa["status"]),
+            dtype=np.intp,
+            count=len(n_all),
+        )
+        n_color = palette[codes]
+        # managers get a thick black border
+        managers = np.array(soa["manager"], dtype=object) == "yes"
+        # other nodes keep matplotlib's default outline in their fill colour
+        n_edgecolor = np.where(managers, "black", n_color)
+        n_linewidth = np.where(managers, 5.0, rcParams["patch.linewidth"])
+
+        # All nodes are drawn as one collection
+        _draw_nodes(
+            g,
+            pos,
+            n_all,
+            n_color.tolist(),
+            node_size,
+            margin,
+            n_linewidth.tolist(),
+            n_edgecolor.tolist(),
+            ax,
+        )
         nx.draw_networkx_labels(
             g,
             pos,
@@ -450,9 +971,12 @@ class OrganisationDiagrammer(object):
             font_family="sans-serif",
             horizontalalignment="center",
             verticalalignment="bottom",
+            ax=ax,
         )
 
-    def draw_networkx_edges(self, g: nx.DiGraph, pos: Dict, cstyle: str):
+    def draw_networkx_edges(
+        self, g: nx.DiGraph, pos: Dict, cstyle: str, ax: Any = None
+    ):
         """
         Draw edges from NetworkX graph.
 
@@ -464,43 +988,54 @@ class OrganisationDiagrammer(object):
             Dictionary of tuples of (x,y) positions of all nodes
         cstyle : `str`
             Style to use for edges.  Can be one of: ['arc','arc3','angle','angle3'].
+        ax : `matplotlib.axes.Axes`
+            Axes to draw on.  Default is the current pyplot Axes
 
         **Returns**
 
         """
-        logger.info(f"OrganisationDiagrammer::draw_networkx_edges() - cstyle={cstyle}")
-        # 1. Pull out the different relationships for edges
-        # Can be 1 for direct management, 2 for indirect management, 3 for a perm yet to join, 4 for a perm leaving.
-        e_direct = [
-            (u, v) for (u, v, d) in g.edges(data=True) if d.get("relationship") == 1
-        ]
-        e_indirect = [
-            (u, v) for (u, v, d) in g.edges(data=True) if d.get("relationship") == 2
-        ]
-        e_starting = [
-            (u, v) for (u, v, d) in g.edges(data=True) if d.get("relationship") == 3
-        ]
-        e_leaving = [
-            (u, v) for (u, v, d) in g.edges(data=True) if d.get("relationship") == 4
-        ]
-
-        # styles - see: https://matplotlib.org/stable/api/_as_gen/matplotlib.patches.Patch.html#matplotlib.patches.Patch.set_linestyle
-        def drawNetworkXEdges(elist: List, w: int, a: float, color: str, style: str):
-            nx.draw_networkx_edges(
-                g,
-                pos,
-                connectionstyle=cstyle,
-                edgelist=elist,
-                width=w,
-                alpha=a,
-                edge_color=color,
-                style=style,
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "OrganisationDiagrammer::draw_networkx_edges() - cstyle=%s", cstyle
             )
-
-        drawNetworkXEdges(e_direct, 4, 0.8, "g", "solid")
-        drawNetworkXEdges(e_indirect, 4, 0.8, "g", "dotted")
-        drawNetworkXEdges(e_starting, 4, 0.8, "teal", "dotted")
-        drawNetworkXEdges(e_leaving, 4, 0.8, "orange", "dotted")
+        # 1. Map each edge's relationship to its colour and line style with lookup tables
+        # Can be 1 for direct management, 2 for indirect management, 3 for a perm yet to join, 4 for a perm leaving.
+        # Anything else maps to 0 and is not drawn.
+        style_map = np.array([None, "solid", "dotted", "dotted", "dotted"], dtype=object)
+        color_map = np.array([None, "g", "g", "teal", "orange"], dtype=object)
+        relation_index = {1: 1, 2: 2, 3: 3, 4: 4}
+        edges = list(g.edges(data=True))
+        rel = np.fromiter(
+            (relation_index.get(d.get("relationship"), 0) for _, _, d in edges),
+            dtype=np.int8,
+            count=len(edges),
+        )
+        keep = np.nonzero(rel)[0]
+        elist = [edges[i][:2] for i in keep]
+        styles = style_map[rel[keep]].tolist()
+        colors = color_map[rel[keep]].tolist()
+
+        # 2. Draw them all with one call
+        if ax is None:
+            import matplotlib.pyplot as plt  # type: ignore
+
+            ax = plt.gca()
+        data_lim = ax.dataLim.frozen()
+        _draw_edges(g, pos, elist, cstyle, 4, 0.8, colors, styles, ax)
+
+        # 3. networkx pads the data limits by 5% of the extent of the edges drawn in
+        # each call.  Edges used to be drawn one relationship at a time so put back
+        # the union of those per-relationship boxes in place of the single wider one.
+        if elist:
+            ax.dataLim.set(data_lim)
+            ends = np.array([(pos[u], pos[v]) for u, v in elist], dtype=float)
+            kept = rel[keep]
+            for code in np.unique(kept):
+                xy = ends[kept == code].reshape(-1, 2)
+                lo, hi = xy.min(axis=0), xy.max(axis=0)
+                pad = 0.05 * (hi - lo)
+                ax.update_datalim((lo - pad, hi + pad))
+            ax.autoscale_view()
 
     def draw_networkx_edge_labels(
         self,
@@ -510,6 +1045,7 @@ class OrganisationDiagrammer(object):
         font_size: int,
         using_edge_labels: bool,
         edge_label_height: float,
+        ax: Any = None,
     ):
         """
         Draw edge labels from NetworkX graph controlling position and size.
@@ -528,13 +1064,18 @@ class OrganisationDiagrammer(object):
             True if we are using edge labels.
         edge_label_height : `int`
             Edge label height if we are using edge labels.
+        ax : `matplotlib.axes.Axes`
+            Axes to draw on.  Default is the current pyplot Axes
 
         **Returns**
 
         """
-        logger.info(
-            f"OrganisationDiagrammer::draw_networkx_edge_labels() - cstyle={cstyle}, using_edge_labels={using_edge_labels}"
-        )
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "OrganisationDiagrammer::draw_networkx_edge_labels() - cstyle=%s, using_edge_labels=%s",
+                cstyle,
+                using_edge_labels,
+            )
         # node that our edge labels are now pulled from our nodes
         # node labels - rotate edge labels to be horizontal
         size = font_size
@@ -551,23 +1092,31 @@ class OrganisationDiagrammer(object):
                     for u, v, d in g.edges(data=True)
                 ]
             )
-            if cstyle in ["arc", "arc3"]:
-                text = nx.draw_networkx_edge_labels(
-                    g,
-                    pos,
-                    font_size=size,
-                    edge_labels=edge_labels,
-                    label_pos=edge_label_height,
-                )
-            elif cstyle in ["angle", "angle3"]:
-                text = nx.draw_networkx_edge_labels(
-                    g, pos, font_size=size, edge_labels=edge_labels, label_pos=0.15
-                )
+            # angled edges put their labels near the source, any other style (eg.
+            # 'arc3,rad=0.2') uses the given edge label height
+            if cstyle in ["angle", "angle3"]:
+                label_pos = 0.15
+            else:
+                label_pos = edge_label_height
+            text = nx.draw_networkx_edge_labels(
+                g,
+                pos,
+                font_size=size,
+                edge_labels=edge_labels,
+                label_pos=label_pos,
+                ax=ax,
+            )
             for _, t in text.items():
                 t.set_rotation("horizontal")
 
     def draw_networkx_text_labels(
-        self, g: nx.DiGraph, pos: Dict, font_size: int, offset: float
+        self,
+        g: nx.DiGraph,
+        pos: Dict,
+        font_size: int,
+        offset: float,
+        ax: Any = None,
+        soa: Optional[Dict[str, List]] = None,
     ):
         """
         Draw text annotations for note and team on node cells from NetworkX graph.
@@ -582,44 +1131,219 @@ class OrganisationDiagrammer(object):
             Font size for text labels.  12 by default.
         offset : `float`
             Offset for text elements.  Default is 0
+        ax : `matplotlib.axes.Axes`
+            Axes to draw on.  Default is the current pyplot Axes
+        soa : `Dict`
+            Node attributes from `node_soa`, built from `g` if not given
 
         **Returns**
 
         """
-        logger.info(
-            f"OrganisationDiagrammer::draw_networkx_text_labels() - font_size={font_size}, offset={offset}"
-        )
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "OrganisationDiagrammer::draw_networkx_text_labels() - font_size=%s, offset=%s",
+                font_size,
+                offset,
+            )
+
+        if ax is None:
+            import matplotlib.pyplot as plt  # type: ignore
+
+            ax = plt.gca()
+        # Text properties for each kind of label are built once and shared by every
+        # label of that kind, and Axes.text is bound locally
+        text = ax.text
+        bbox = {"facecolor": "none", "edgecolor": "none", "alpha": 0.5}
+        team_kw = {"size": font_size * 1.5, "bbox": bbox, "ha": "center"}
+        note_kw = {"size": font_size, "bbox": bbox, "ha": "center"}
+        job_kw = {"size": font_size * 1.25, "bbox": bbox, "ha": "center"}
+        if soa is None:
+            soa = node_soa(g)
+        # Gather all positions into one (N, 2) array up front; nodes that were
+        # not laid out get NaN and are skipped as they have nowhere to put labels
+        missing = (np.nan, np.nan)
+        xy = np.array([pos.get(name, missing) for name in soa["name"]], dtype=float)
+        xy = xy.reshape(-1, 2)
+        placed = ~np.isnan(xy[:, 0])
+        # Each kind of label is offset from its node in one array operation, then
+        # only the Text artist creation is left to the loop.
+        # team goes above the node, note inside it and jobtitle below it
+        for values, dy, kw, proc in (
+            (soa["team"], offset * 2, team_kw, _plain),
+            (soa["note"], -offset, note_kw, _newline),
+            (soa["jobtitle"], -offset * 2, job_kw, _plain),
+        ):
+            shown = placed & np.array([bool(v) for v in values], dtype=bool)
+            index = np.nonzero(shown)[0]
+            label_xy = xy[index] + (0.0, dy)
+            for (x, y), i in zip(label_xy.tolist(), index.tolist()):
+                text(x, y, proc(values[i]), **kw)
+
+    def graphviz_layout(
+        self,
+        g: nx.DiGraph,
+        args: str = DEFAULT_LAYOUT_ARGS,
+        chunk_size: int = DEFAULT_LAYOUT_CHUNK_SIZE,
+    ) -> Dict:
+        """
+        Run graphviz `dot` over the NetworkX graph to position its nodes.  Running `dot`
+        is by far the most expensive part of a render so layouts are cached, in memory
+        and in `CACHE_DIR`, against a digest of the graph content and `dot` arguments,
+        letting re-renders with different styling skip it.  Graphs with more than
+        `chunk_size` nodes are laid out in pieces with `create_graphviz_layout_chunked`.
 
-        # note labels - rotate edge labels to be horizontal
-        def drawTextField(y: float, text: str, size: float, fcolor: str = "none"):
-            plt.text(
-                x,
-                y,
-                s=text,
-                size=size,
-                bbox=dict(facecolor=fcolor, edgecolor=ecolor, alpha=0.5),
-                horizontalalignment="center",
+        **Parameters**
+
+        g : `nx.DiGraph`
+            NetworkX graph of organisation built from yaml_data
+        args : `str`
+            Arguments passed through to `dot`.  Default is `DEFAULT_LAYOUT_ARGS`
+        chunk_size : `int`
+            Node count above which the layout is chunked.  Default is `DEFAULT_LAYOUT_CHUNK_SIZE` (200)
+
+        **Returns**
+
+        pos : `Dict`
+            Dictionary of tuples of (x,y) positions of all nodes
+
+        """
+        # Node/edge order and attributes (eg. edge labels) all influence dot's layout
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(args.encode())
+        digest.update(str(chunk_size).encode())
+        digest.update(repr(list(g.nodes(data=True))).encode())
+        digest.update(repr(list(g.edges(data=True))).encode())
+        key = digest.hexdigest()
+        pos = self._layout_cache.get(key)
+        if pos is None:
+            pos = self._cached_layout(g, key, args, chunk_size)
+            self._layout_cache[key] = pos
+        # Hand back a copy so callers can adjust positions without touching the cache
+        return dict(pos)
+
+    def _cached_layout(
+        self, g: nx.DiGraph, key: str, args: str, chunk_size: int
+    ) -> Dict:
+        # Layouts are also pickled to disk so separate runs over an unchanged
+        # organisation, eg. tweaking colours or scale, skip dot altogether
+        cache = _cache_path(key, ".layout")
+        try:
+            with open(cache, "rb") as file:
+                pos = pickle.load(file)
+            logger.info(
+                f'OrganisationDiagrammer::graphviz_layout() - using cached "{cache}"'
             )
+            return pos
+        except (OSError, EOFError, pickle.UnpicklingError):
+            pass
+        logger.info(f"OrganisationDiagrammer::graphviz_layout() - running dot for {key}")
+        if g.number_of_nodes() > chunk_size:
+            pos = self.create_graphviz_layout_chunked(g, chunk_size, args)
+        else:
+            pos = nx.nx_agraph.graphviz_layout(g, prog="dot", root=None, args=args)
+        _save_cache(cache, pos, pickle.dump, "wb")
+        return pos
+
+    def create_graphviz_layout_chunked(
+        self,
+        g: nx.DiGraph,
+        chunk_size: int = DEFAULT_LAYOUT_CHUNK_SIZE,
+        args: str = DEFAULT_LAYOUT_ARGS,
+    ) -> Dict:
+        """
+        Position the nodes of a large graph by running `dot` over pieces of at most
+        `chunk_size` nodes and composing the results.  `dot`'s crossing minimisation is
+        superlinear so several small runs are much quicker than one big one, and very
+        large organisations may not finish at all in a single run.
 
-        n_note = [(u, d) for (u, d) in g.nodes(data=True) if d.get("note")]
-        n_team = [(u, d) for (u, d) in g.nodes(data=True) if d.get("team")]
-        n_jobtitle = [(u, d) for (u, d) in g.nodes(data=True) if d.get("jobtitle")]
+        The graph is rooted at nodes nobody reports to and walked depth first so each
+        chunk is made of whole reporting lines wherever possible.  Each connected piece
+        of a chunk is given its own horizontal slot and shifted down so its top node
+        sits at the height of its reporting depth in the whole organisation.  Edges
+        between chunks are still drawn but are not considered by `dot`.
 
-        fcolor = "none"
-        ecolor = "none"
-        size = font_size
-        for name, d in n_team:  # node team goes above the node
-            x, y = pos.get(name)
-            team = d.get("team")
-            drawTextField(y + offset * 2, team, size * 1.5, fcolor)
-        for name, d in n_note:  # node note goes inside the node
-            x, y = pos.get(name)
-            note = proc_field(d.get("note"), True)
-            drawTextField(y - offset, note, size, fcolor)
-        for name, d in n_jobtitle:  # jobtitle goes below the node
-            x, y = pos.get(name)
-            job = d.get("jobtitle")
-            drawTextField(y - offset * 2, job, size * 1.25, fcolor)
+        **Parameters**
+
+        g : `nx.DiGraph`
+            NetworkX graph of organisation built from yaml_data
+        chunk_size : `int`
+            Maximum number of nodes passed to each `dot` run.  Default is `DEFAULT_LAYOUT_CHUNK_SIZE` (200)
+        args : `str`
+            Arguments passed through to `dot`.  Default is `DEFAULT_LAYOUT_ARGS`
+
+        **Returns**
+
+        pos : `Dict`
+            Dictionary of tuples of (x,y) positions of all nodes
+
+        """
+        # (a) root by reporting lines, falling back to any unvisited node for cycles
+        depth: Dict[Any, int] = {}
+        order = []
+        roots = [n for n, d in g.in_degree() if d == 0]
+        for root in roots + list(g):
+            if root in depth:
+                continue
+            depth[root] = 0
+            stack = [root]
+            while stack:
+                u = stack.pop()
+                order.append(u)
+                for v in reversed(list(g.successors(u))):
+                    if v not in depth:
+                        depth[v] = depth[u] + 1
+                        stack.append(v)
+        # (b) depth first order keeps subtrees together within a chunk
+        chunks = [order[i : i + chunk_size] for i in range(0, len(order), chunk_size)]
+        logger.info(
+            f"OrganisationDiagrammer::create_graphviz_layout_chunked() - {len(order)} nodes in {len(chunks)} chunks"
+        )
+        # (c) lay out each chunk independently
+        layouts = [
+            nx.nx_agraph.graphviz_layout(g.subgraph(c), prog="dot", args=args)
+            for c in chunks
+        ]
+        # Measure dot's rank separation so chunks can be aligned by reporting depth
+        steps = [
+            abs(p[u][1] - p[v][1])
+            for c, p in zip(chunks, layouts)
+            for u, v in g.subgraph(c).edges()
+            if depth[v] == depth[u] + 1 and p[u][1] != p[v][1]
+        ]
+        rank_step = statistics.median(steps) if steps else DEFAULT_RANK_STEP
+        # Measure dot's spacing between neighbours on a rank to use as the gap
+        # between pieces placed side by side
+        gaps = []
+        for p in layouts:
+            ranks: Dict[float, List[float]] = {}
+            for x, y in p.values():
+                ranks.setdefault(y, []).append(x)
+            for xs in ranks.values():
+                xs.sort()
+                gaps.extend(b - a for a, b in zip(xs, xs[1:]) if b > a)
+        gap = min(gaps) if gaps else rank_step
+        # (d) translate each connected piece into place and (e) merge.  dot only
+        # keeps the disconnected pieces of a chunk apart on shared ranks, so once
+        # each piece is shifted down to its reporting depth they could collide;
+        # every piece therefore gets its own horizontal slot.
+        pos: Dict = {}
+        x_offset = 0.0
+        for c, p in zip(chunks, layouts):
+            pieces = sorted(
+                nx.weakly_connected_components(g.subgraph(c)),
+                key=lambda piece: min(p[n][0] for n in piece),
+            )
+            for piece in pieces:
+                xs = [p[n][0] for n in piece]
+                dx = x_offset - min(xs)
+                # align each piece by its own shallowest node
+                top = min(piece, key=lambda n: depth[n])
+                dy = -depth[top] * rank_step - p[top][1]
+                for n in piece:
+                    x, y = p[n]
+                    pos[n] = (x + dx, y + dy)
+                x_offset += max(xs) - min(xs) + gap
+        return pos
 
     def create_graphviz_layout_from_graph(
         self,
@@ -632,6 +1356,8 @@ class OrganisationDiagrammer(object):
         image_file: str = "org.png",
         scale: int = 5,
         resetScale: bool = True,
+        pos: Optional[Dict] = None,
+        edge_labels: bool = False,
     ) -> nx.DiGraph:
         """
         Create graphviz generated visualisation of organisation from NetworkX graph.
@@ -656,6 +1382,11 @@ class OrganisationDiagrammer(object):
             Scale of generated image
         resetScale : `bool`
             Whether to reset scale or not.
+        pos : `Dict`
+            Optional precomputed (x,y) positions of all nodes, eg. from `graphviz_layout`.
+            When given `dot` is not run at all.
+        edge_labels : `bool`
+            Whether to draw edge labels.  Default is False as labels come from the nodes
 
         **Returns**
 
@@ -663,34 +1394,74 @@ class OrganisationDiagrammer(object):
             NetworkX graph of organisation built from yaml_data
 
         """
+        # matplotlib is only imported once a render is needed which keeps YAML/dot
+        # only use of this module quick to start and light on memory.
+        from matplotlib import rc_context  # type: ignore
+
         logger.info(f"OrganisationDiagrammer::create_graphviz_layout_from_graph()")
         # Note the args here are inputs to dot.  Type dot -h to see options
         # See: https://renenyffenegger.ch/notes/tools/Graphviz/examples/organization-chart for an org chart example
         # See: https://stackoverflow.com/questions/57512155/how-to-draw-a-tree-more-beautifully-in-networkx for circo reference
-        plt.clf()
-        args = "-Gnodesep=3 -Granksep=0 -Gpad=0.1 -Grankdir=TB"
-        pos = nx.nx_agraph.graphviz_layout(g, prog="dot", root=None, args=args)
-
-        self.draw_networkx_nodes(g, pos, margin, node_size, font_size)
-        self.draw_networkx_edges(g, pos, cstyle)
-        using_edge_labels = False
-        self.draw_networkx_edge_labels(
-            g, pos, cstyle, font_size - 4, using_edge_labels, DEFAULT_EDGE_LABEL_HEIGHT
-        )
-        self.draw_networkx_text_labels(g, pos, font_size - 4, offset)
-
-        logger.info(f'saving graph to "{image_file}"')
-        plt.axis("off")
-        params = plt.gcf()
-        plSize = params.get_size_inches()
-        params.set_size_inches((plSize[0] * scale, plSize[1] * scale))
-        logger.info(f'plSize = {plSize}, setting image size to {plSize[0] * scale} by {plSize[1] * scale}')
-        plt.savefig(image_file, bbox_inches="tight")
+        if pos is None:
+            pos = self.graphviz_layout(g)
+
+        with rc_context(RENDER_RC_PARAMS):
+            fig, ax = self._figure()
+            # node attributes are gathered once per render and shared by the draws
+            soa = node_soa(g)
+            self.draw_networkx_nodes(g, pos, margin, node_size, font_size, ax, soa)
+            self.draw_networkx_edges(g, pos, cstyle, ax)
+            if edge_labels:
+                self.draw_networkx_edge_labels(
+                    g, pos, cstyle, font_size - 4, True, DEFAULT_EDGE_LABEL_HEIGHT, ax
+                )
+            self.draw_networkx_text_labels(g, pos, font_size - 4, offset, ax, soa)
+
+            logger.info(f'saving graph to "{image_file}"')
+            ax.set_axis_off()
+            plSize = fig.get_size_inches()
+            fig.set_size_inches((plSize[0] * scale, plSize[1] * scale))
+            logger.info(f'plSize = {plSize}, setting image size to {plSize[0] * scale} by {plSize[1] * scale}')
+            fig.savefig(image_file, bbox_inches="tight")
         if resetScale:
             # We need to reset the size of the figure to the original size
-            params.set_size_inches((plSize[0], plSize[1]))
+            fig.set_size_inches((plSize[0], plSize[1]))
         return g
 
+    def _figure(self) -> tuple:
+        # The figure is drawn with the object oriented API straight onto an Agg
+        # canvas, so pyplot's global figure state is neither consulted nor disturbed.
+        # One Figure and Axes are kept and cleared between renders rather than
+        # building a new figure and canvas every time.
+        if self._fig is None:
+            from matplotlib.figure import Figure  # type: ignore
+            from matplotlib.backends.backend_agg import FigureCanvasAgg  # type: ignore
+
+            self._fig = Figure()
+            FigureCanvasAgg(self._fig)
+            self._ax = self._fig.add_subplot()
+            self._fig_size = self._fig.get_size_inches()
+        else:
+            self._ax.clear()
+            self._fig.set_size_inches(self._fig_size)
+        return self._fig, self._ax
+
+    def close(self):
+        """
+        Release the matplotlib Figure kept for rendering.  A later render creates a
+        new one.
+
+        **Parameters**
+
+        **Returns**
+
+        """
+        logger.info(f"OrganisationDiagrammer::close()")
+        if self._fig is not None:
+            self._fig.clear()
+        self._fig = None
+        self._ax = None
+
     def create_dotfile_from_graph(self, g: nx.DiGraph, dot_file: str) -> str:
         """
         Create dotfile from NetworkX graph.
@@ -711,9 +1482,17 @@ class OrganisationDiagrammer(object):
         logger.info(
             f"OrganisationDiagrammer::create_dotfile_from_graph() - target={dot_file}"
         )
-        # nx.drawing.nx_pydot is deprecated.
-        # nx.drawing.nx_pydot.write_dot(g, dot_file)
-        nx.nx_agraph.write_dot(g, dot_file)
+        # nx.drawing.nx_pydot is deprecated and nx.nx_agraph.write_dot builds a whole
+        # pygraphviz AGraph just to serialise it, so write the DOT out directly.
+        buf = io.StringIO()
+        buf.write('strict digraph "" {\n')
+        for n, d in g.nodes(data=True):
+            buf.write(f"\t{_dot_id(n)}{_dot_attrs(d)};\n")
+        for u, v, d in g.edges(data=True):
+            buf.write(f"\t{_dot_id(u)} -> {_dot_id(v)}{_dot_attrs(d)};\n")
+        buf.write("}\n")
+        with open(dot_file, "w") as f:
+            f.write(buf.getvalue())
         return dot_file
 
 def main(arguments: Dict, open_image: bool=True):
@@ -783,8 +1562,7 @@ def main(arguments: Dict, open_image: bool=True):
     else:
         t0 = time.time()
         org = OrganisationDiagrammer(margin=margin, node_size=node_size)
-        data = org.load_yaml_file(source)
-        graph = org.create_graph_from_yaml(data)
+        graph = org.build_graph_from_yaml_file(source)
         target = source[:-5] + ".dot"
         dotfile = org.create_dotfile_from_graph(graph, target)
         print(
@@ -792,20 +1570,39 @@ def main(arguments: Dict, open_image: bool=True):
             f" {get_file_size(dotfile)}kB"
         )
         image = source[:-5] + ".png"
-        org.create_graphviz_layout_from_graph(
-            graph,
-            margin=margin,
-            cstyle=cstyle,
-            node_size=node_size,
-            offset=offset,
-            font_size=font_size,
-            image_file=image,
-        )
-        print(
-            f"Successfully generated organogram into file {image} of size"
-            f" {get_file_size(image)}kB"
-        )
+        # Skip the render if the image is newer than the YAML and was drawn with the
+        # same parameters, recorded as a digest alongside the image.
+        params_file = image + ".params"
+        digest = hashlib.sha1(
+            repr((VERSION, margin, cstyle, node_size, offset, font_size)).encode()
+        ).hexdigest()
+        stored_digest = None
+        if os.path.exists(image) and os.path.exists(params_file):
+            if os.path.getmtime(image) > os.path.getmtime(source):
+                with open(params_file, "r") as f:
+                    stored_digest = f.read().strip()
+        if stored_digest == digest:
+            logger.info(f'"{image}" is up to date with "{source}", skipping render')
+            print(f"Organogram {image} is up to date, skipping render")
+        else:
+            org.create_graphviz_layout_from_graph(
+                graph,
+                margin=margin,
+                cstyle=cstyle,
+                node_size=node_size,
+                offset=offset,
+                font_size=font_size,
+                image_file=image,
+            )
+            with open(params_file, "w") as f:
+                f.write(digest)
+            print(
+                f"Successfully generated organogram into file {image} of size"
+                f" {get_file_size(image)}kB"
+            )
         if open_image:
+            from PIL import Image
+
             Image.open(image).show()
         t1 = time.time()
         print(
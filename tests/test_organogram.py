@@ -1,7 +1,10 @@
 import os
+import pickle
 import yaml
 import pytest
-from organogram import OrganisationDiagrammer, split_line, proc_field, main
+import networkx as nx
+import organogram
+from organogram import OrganisationDiagrammer, split_line, proc_field, _make_proc, node_soa, get_file_digest, peek_yaml_header, main
 
 # To get code coverage support:
 # 1. pip install coverage, pytest-cov
@@ -12,6 +15,12 @@ from organogram import OrganisationDiagrammer, split_line, proc_field, main
 
 # ---- FIXTURES -----
 
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    # Keep parsed YAML and graph caches out of the user's cache directory
+    monkeypatch.setattr(organogram, "CACHE_DIR", str(tmp_path / "cache"))
+    organogram._YAML_CACHE.clear()
+
 @pytest.fixture
 def diagrammer():
     return OrganisationDiagrammer()
@@ -80,6 +89,13 @@ yaml_data_zero = {
 
 # ---- TESTS -----
 
+def test_make_proc():
+    for newline in (False, True):
+        for upper in (False, True):
+            proc = _make_proc(newline, upper)
+            for val in ("Mickey Mouse", "Team A b", "Solo", "", None):
+                assert proc(val) == proc_field(val, newline, upper)
+
 def test_load_yaml_file(diagrammer: OrganisationDiagrammer):
     yaml_file = "example.yaml"
     with open(yaml_file, 'w') as f:
@@ -87,6 +103,61 @@ def test_load_yaml_file(diagrammer: OrganisationDiagrammer):
     loaded_data = diagrammer.load_yaml_file(yaml_file)
     assert loaded_data == yaml_data
 
+def test_load_yaml_file_cache(diagrammer: OrganisationDiagrammer):
+    yaml_file = "example_cache.yaml"
+    with open(yaml_file, 'w') as f:
+        f.write(yaml.dump(yaml_data))
+    loaded_data = diagrammer.load_yaml_file(yaml_file)
+    cache = os.path.join(organogram.CACHE_DIR, get_file_digest(yaml_file) + ".yaml.pickle")
+    assert os.path.exists(cache)
+    with open(cache, 'rb') as f:
+        assert pickle.load(f) == yaml_data
+    # A second load is served from the cache, even if mtime changes
+    os.utime(yaml_file, (0, 0))
+    assert diagrammer.load_yaml_file(yaml_file) == loaded_data
+    # Changed content gets its own cache entry
+    with open(yaml_file, 'w') as f:
+        f.write(yaml.dump(yaml_data_mini))
+    assert diagrammer.load_yaml_file(yaml_file) == yaml_data_mini
+    assert len(os.listdir(organogram.CACHE_DIR)) == 2
+
+def test_load_yaml_file_cache_types(diagrammer: OrganisationDiagrammer):
+    yaml_file = "example_types.yaml"
+    with open(yaml_file, 'w') as f:
+        f.write("nodes: []\nedges: []\nextra: {1: one, 2023-04-02: date}\n")
+    loaded_data = diagrammer.load_yaml_file(yaml_file)
+    # A later process served from the disk cache sees the same keys and types
+    organogram._YAML_CACHE.clear()
+    assert diagrammer.load_yaml_file(yaml_file) == loaded_data
+    assert 1 in loaded_data["extra"]
+
+def test_load_yaml_file_memory_cache(diagrammer: OrganisationDiagrammer, monkeypatch):
+    yaml_file = "example_memory.yaml"
+    with open(yaml_file, 'w') as f:
+        f.write(yaml.dump(yaml_data))
+    loaded_data = diagrammer.load_yaml_file(yaml_file)
+    # An unchanged file is served from memory without touching the disk cache
+    with monkeypatch.context() as m:
+        m.setattr(organogram, "get_file_digest", None)
+        assert diagrammer.load_yaml_file(yaml_file) == loaded_data
+    # Changing the returned data does not affect later loads
+    loaded_data["nodes"].clear()
+    assert diagrammer.load_yaml_file(yaml_file) == yaml_data
+    monkeypatch.setattr(organogram, "YAML_CACHE_SIZE", 1)
+    diagrammer.load_yaml_file("test.yaml")
+    assert len(organogram._YAML_CACHE) == 1
+
+def test_build_graph_from_yaml_file_cache(diagrammer: OrganisationDiagrammer):
+    graph = diagrammer.build_graph_from_yaml_file("test.yaml")
+    assert len([f for f in os.listdir(organogram.CACHE_DIR) if f.endswith(".pickle")]) == 1
+    cached = diagrammer.build_graph_from_yaml_file("test.yaml")
+    assert cached is not graph
+    assert list(cached.nodes(data=True)) == list(graph.nodes(data=True))
+    assert list(cached.edges(data=True)) == list(graph.edges(data=True))
+    # Different build options are cached separately
+    diagrammer.build_graph_from_yaml_file("test.yaml", newline=False)
+    assert len([f for f in os.listdir(organogram.CACHE_DIR) if f.endswith(".pickle")]) == 2
+
 def test_create_graph_from_yaml(diagrammer: OrganisationDiagrammer):
     graph = diagrammer.create_graph_from_yaml(yaml_data)
     
@@ -96,6 +167,53 @@ def test_create_graph_from_yaml(diagrammer: OrganisationDiagrammer):
     assert graph.has_node(proc_field("B"))
     assert graph.has_edge(proc_field("A"), proc_field("B"))
 
+def test_node_soa(diagrammer: OrganisationDiagrammer):
+    graph = diagrammer.create_graph_from_yaml(yaml_data)
+    soa = node_soa(graph)
+
+    assert soa["name"] == list(graph.nodes)
+    assert soa["status"] == ["perm", "perm"]
+    assert soa["manager"] == ["yes", "no"]
+    assert soa["jobtitle"] == ["CEO", "CTO"]
+
+def test_build_graph_from_yaml_file(diagrammer: OrganisationDiagrammer):
+    for newline in (True, False):
+        expected = diagrammer.create_graph_from_yaml(diagrammer.load_yaml_file("test.yaml"), newline)
+        graph = diagrammer.build_graph_from_yaml_file("test.yaml", newline)
+        assert list(graph.nodes(data=True)) == list(expected.nodes(data=True))
+        assert list(graph.edges(data=True)) == list(expected.edges(data=True))
+
+def test_build_graph_from_yaml_file_alias(diagrammer: OrganisationDiagrammer):
+    yaml_file = "example_alias.yaml"
+    with open(yaml_file, 'w') as f:
+        f.write("nodes:\n- &ceo {id: A}\n- *ceo\nedges: []\n")
+    with pytest.raises(ValueError):
+        diagrammer.build_graph_from_yaml_file(yaml_file)
+
+def test_peek_yaml_header(diagrammer: OrganisationDiagrammer):
+    # The third node is cut short by the line limit so is dropped
+    head = peek_yaml_header("test.yaml", max_lines=20)
+    assert [n["id"] for n in head["nodes"]] == ["Mickey Mouse", "Donald Duck"]
+    assert peek_yaml_header("test.yaml", max_lines=1000) == diagrammer.load_yaml_file("test.yaml")
+
+def test_load_yaml_file_validate_header(diagrammer: OrganisationDiagrammer):
+    # An invalid status at the head of a file whose tail is not even valid YAML
+    yaml_file = "example_header.yaml"
+    with open(yaml_file, 'w') as f:
+        f.write("nodes:\n  - id: A\n    status: bogus\n")
+        f.write("  - id: B\n    status: perm\n" * 50)
+        f.write("  - id: [unclosed\n")
+    with pytest.raises(yaml.YAMLError):
+        diagrammer.load_yaml_file(yaml_file)
+    # Only the header check can report the bad status as the full parse fails
+    with pytest.raises(ValueError, match="bogus"):
+        diagrammer.load_yaml_file(yaml_file, validate=True)
+
+def test_default_valid_teams_and_status(diagrammer: OrganisationDiagrammer):
+    assert(diagrammer.valid_teams == ["A", "B", "C", "D", "E", "F"])
+    assert(diagrammer.valid_status == ["perm", "contractor", "starting", "leaving", "moving", "new"])
+    assert(diagrammer.valid_relations == [1, 2, 3, 4])
+
 def test_create_valid_teams_and_status(diagrammer: OrganisationDiagrammer):
     validTeams = ['Team A', 'Team B']
     validStatus = ['perm']
@@ -125,6 +243,17 @@ def test_create_dotfile_from_graph(diagrammer: OrganisationDiagrammer):
     assert isinstance(size, int)
     assert size > 0
 
+def test_create_dotfile_from_graph_content(diagrammer: OrganisationDiagrammer):
+    target = "test_output.dot"
+    graph = diagrammer.create_graph_from_yaml(yaml_data, newline=False)
+    diagrammer.create_dotfile_from_graph(graph, dot_file=target)
+    with open(target) as f:
+        content = f.read()
+
+    assert content.startswith('strict digraph "" {')
+    assert '"A"\t[jobtitle="CEO", manager="yes", status="perm", team="TEAM A"];' in content
+    assert '"A" -> "B"\t[relationship="1"];' in content
+
 def test_create_graphviz_layout_from_graph(diagrammer: OrganisationDiagrammer):
     target = "test_output.png"
     graph = diagrammer.create_graph_from_yaml(yaml_data)
@@ -139,6 +268,138 @@ def test_create_graphviz_layout_from_graph(diagrammer: OrganisationDiagrammer):
     assert isinstance(size, int)
     assert size > 0
 
+def test_graphviz_layout_cache(diagrammer: OrganisationDiagrammer):
+    graph = diagrammer.create_graph_from_yaml(yaml_data)
+    pos = diagrammer.graphviz_layout(graph)
+
+    assert set(pos) == set(graph.nodes)
+    assert diagrammer.graphviz_layout(graph) == pos
+    pos[proc_field("A")] = (0.0, 0.0)
+    assert diagrammer.graphviz_layout(graph) != pos
+    graph.add_edge(proc_field("B"), proc_field("C"), relationship=1)
+    diagrammer.graphviz_layout(graph)
+    assert len(diagrammer._layout_cache) == 2
+
+def test_graphviz_layout_disk_cache(diagrammer: OrganisationDiagrammer, monkeypatch):
+    graph = diagrammer.create_graph_from_yaml(yaml_data)
+    pos = diagrammer.graphviz_layout(graph)
+    assert len([f for f in os.listdir(organogram.CACHE_DIR) if f.endswith(".layout")]) == 1
+    # A fresh diagrammer reuses the pickled layout rather than running dot
+    monkeypatch.setattr(nx.nx_agraph, "graphviz_layout", None)
+    assert OrganisationDiagrammer().graphviz_layout(graph) == pos
+
+def test_create_graphviz_layout_chunked(diagrammer: OrganisationDiagrammer):
+    # A CEO with five managers each leading five engineers
+    graph = nx.DiGraph()
+    for m in range(5):
+        graph.add_edge("CEO", f"M{m}", relationship=1)
+        for e in range(5):
+            graph.add_edge(f"M{m}", f"E{m}{e}", relationship=1)
+    pos = diagrammer.create_graphviz_layout_chunked(graph, chunk_size=8)
+
+    assert set(pos) == set(graph.nodes)
+    assert len(set(pos.values())) == graph.number_of_nodes()
+    for u, v in graph.edges():
+        assert pos[u][1] > pos[v][1]
+    assert diagrammer.graphviz_layout(graph, chunk_size=8) == pos
+
+def test_create_graphviz_layout_chunked_no_overlap(diagrammer: OrganisationDiagrammer):
+    import numpy as np
+    # A 600 person organisation where everyone manages up to four people
+    graph = nx.DiGraph()
+    for i in range(1, 600):
+        graph.add_edge(f"P{(i - 1) // 4}", f"P{i}", relationship=1)
+
+    def min_distance(pos):
+        xy = np.array(list(pos.values()))
+        d = np.sqrt(((xy[:, None] - xy[None]) ** 2).sum(-1))
+        np.fill_diagonal(d, np.inf)
+        return d.min()
+
+    pos = diagrammer.create_graphviz_layout_chunked(graph, chunk_size=200)
+    whole = nx.nx_agraph.graphviz_layout(graph, prog="dot", args=organogram.DEFAULT_LAYOUT_ARGS)
+    # No two nodes end up closer together than dot itself ever places them
+    assert set(pos) == set(graph.nodes)
+    assert min_distance(pos) >= min_distance(whole)
+
+def test_create_graphviz_layout_from_graph_pos(diagrammer: OrganisationDiagrammer):
+    target = "test_output.png"
+    graph = diagrammer.create_graph_from_yaml(yaml_data)
+    pos = {proc_field("A"): (0.0, 100.0), proc_field("B"): (0.0, 0.0)}
+    diagrammer.create_graphviz_layout_from_graph(graph, font_size=12, cstyle='arc', margin=0.1, offset=2, node_size=10000, image_file=target, pos=pos)
+
+    assert diagrammer._layout_cache == {}
+    assert os.path.getsize(target) > 0
+
+def test_create_graphviz_layout_from_graph_no_pyplot(diagrammer: OrganisationDiagrammer):
+    import matplotlib.pyplot as plt
+    plt.close("all")
+    graph = diagrammer.create_graph_from_yaml(yaml_data)
+    diagrammer.create_graphviz_layout_from_graph(graph, font_size=12, cstyle='arc', margin=0.1, offset=2, node_size=10000, image_file="test_output.png")
+    # Rendering draws on its own Figure so no pyplot figures are created
+    assert plt.get_fignums() == []
+
+def test_create_graphviz_layout_from_graph_modified_graph(diagrammer: OrganisationDiagrammer):
+    graph = diagrammer.create_graph_from_yaml(yaml_data)
+    args = dict(font_size=12, cstyle='arc', margin=0.1, offset=2, node_size=10000, image_file="test_output.png")
+    diagrammer.create_graphviz_layout_from_graph(graph, **args)
+    # Swapping a node for another leaves the node count unchanged
+    graph.remove_node(proc_field("B"))
+    graph.add_node(proc_field("C"), status="leaving", manager="no")
+    graph.add_edge(proc_field("A"), proc_field("C"), relationship=1)
+    diagrammer.create_graphviz_layout_from_graph(graph, **args)
+    assert os.path.getsize("test_output.png") > 0
+
+def test_create_graphviz_layout_from_graph_no_edges(diagrammer: OrganisationDiagrammer):
+    target = "test_output.png"
+    lone = diagrammer.create_graph_from_yaml({"nodes": [{"id": "A", "status": "perm"}], "edges": []})
+    undrawn = diagrammer.create_graph_from_yaml(yaml_data)
+    nx.set_edge_attributes(undrawn, 7, "relationship")
+    for graph in (lone, undrawn):
+        for cstyle in ('arc3', 'angle'):
+            diagrammer.create_graphviz_layout_from_graph(graph, font_size=12, cstyle=cstyle, margin=0.1, offset=2, node_size=10000, image_file=target)
+            assert os.path.getsize(target) > 0
+
+def test_draw_networkx_edges_data_limits(diagrammer: OrganisationDiagrammer):
+    from matplotlib.figure import Figure
+    graph = diagrammer.create_graph_from_yaml(yaml_data)
+    pos = diagrammer.graphviz_layout(graph)
+    ax = Figure().add_subplot()
+    diagrammer.draw_networkx_edges(graph, pos, 'angle', ax=ax)
+    # Same limits as drawing each relationship with its own call
+    expected = Figure().add_subplot()
+    for r in (1, 2, 3, 4):
+        elist = [(u, v) for u, v, d in graph.edges(data=True) if d.get("relationship") == r]
+        nx.draw_networkx_edges(graph, pos, edgelist=elist, arrows=False, ax=expected)
+    assert ax.get_xlim() == expected.get_xlim()
+    assert ax.get_ylim() == expected.get_ylim()
+
+def test_create_graphviz_layout_from_graph_reuses_figure(diagrammer: OrganisationDiagrammer):
+    from PIL import Image, ImageChops
+    graph = diagrammer.create_graph_from_yaml(yaml_data)
+    args = dict(font_size=12, cstyle='arc', margin=0.1, offset=2, node_size=10000, resetScale=False)
+    diagrammer.create_graphviz_layout_from_graph(graph, image_file="test_output.png", **args)
+    fig = diagrammer._fig
+    diagrammer.create_graphviz_layout_from_graph(graph, image_file="test_output.reuse.png", **args)
+    # The same figure is redrawn from scratch at its original size
+    assert diagrammer._fig is fig
+    with Image.open("test_output.png") as first, Image.open("test_output.reuse.png") as second:
+        assert first.size == second.size
+        assert ImageChops.difference(first.convert("RGB"), second.convert("RGB")).getbbox() is None
+    diagrammer.close()
+    assert diagrammer._fig is None
+
+def test_create_graphviz_layout_from_graph_edge_labels(diagrammer: OrganisationDiagrammer):
+    target = "test_output.png"
+    graph = diagrammer.create_graph_from_yaml(yaml_data)
+    for cstyle in ('angle', 'arc', 'arc3,rad=0.2'):
+        diagrammer.create_graphviz_layout_from_graph(graph, font_size=12, cstyle=cstyle, margin=0.1, offset=2, node_size=10000, image_file=target, edge_labels=True)
+        assert os.path.getsize(target) > 0
+
+def test_draw_networkx_text_labels_missing_pos(diagrammer: OrganisationDiagrammer):
+    graph = diagrammer.create_graph_from_yaml(yaml_data)
+    diagrammer.draw_networkx_text_labels(graph, {proc_field("A"): (0.0, 0.0)}, font_size=12, offset=2)
+
 def test_load_yaml_file_zero(diagrammer: OrganisationDiagrammer):
     yaml_file = "example_zero.yaml"
     with open(yaml_file, 'w') as f:
@@ -175,6 +436,15 @@ def test_create_graph_from_yaml_mini(diagrammer: OrganisationDiagrammer):
     assert graph.has_node(proc_field("B"))
     assert graph.has_edge(proc_field("A"), proc_field("B"))
 
+def test_create_graph_from_yaml_validate_invalid(diagrammer: OrganisationDiagrammer):
+    diagrammer.set_valid_teams(['Team A'])
+    with pytest.raises(ValueError):
+        diagrammer.create_graph_from_yaml(yaml_data, validate=True)
+    diagrammer.set_valid_teams(['Team A', 'Team B'])
+    diagrammer.set_valid_relations([2])
+    with pytest.raises(ValueError):
+        diagrammer.create_graph_from_yaml(yaml_data, validate=True)
+
 def test_create_graph_from_yaml_mini_validate(diagrammer: OrganisationDiagrammer):
     diagrammer.set_valid_teams(['Team A', 'Team B'])
     diagrammer.set_valid_status(['perm'])
@@ -228,3 +498,23 @@ def test_main_some_args():
     }
     main(arguments, open_image=False)
 
+
+def test_main_skips_unchanged_render(capsys):
+    arguments = {
+         '--fontsize': [12],
+         '--help': 0,
+         '--margin': [0.3],
+         '--nodesize': [],
+         '--offset': [16],
+         '--source': ['test.yaml'],
+         '--style': ['arc3'],
+         '--verbose': 0,
+         '--version': 0,
+    }
+    main(arguments, open_image=False)
+    assert "Successfully generated organogram" in capsys.readouterr().out
+    main(arguments, open_image=False)
+    assert "up to date, skipping render" in capsys.readouterr().out
+    arguments['--fontsize'] = [14]
+    main(arguments, open_image=False)
+    assert "Successfully generated organogram" in capsys.readouterr().out